@@ -5,19 +5,29 @@ A Streamlit-based analytics dashboard for renewable energy project
 financial model evaluation and analysis.
 """
 
+import math
 import sqlite3
 import sys
+from itertools import cycle
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit as st
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 
 # Configuration
 ANALYTICS_DIR = Path(__file__).parent
 DB_PATH = ANALYTICS_DIR / "renewable_energy.db"
+MAX_PLOT_POINTS = 2000
+PROJECTS_PAGE_SIZE = 50
+BUBBLE_SIZE_MAX = 20
+MONTH_NAMES = np.array(["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                        "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
 
 # Add analytics directory to path for imports
 if str(ANALYTICS_DIR) not in sys.path:
@@ -47,60 +57,288 @@ st.set_page_config(
 
 
 @st.cache_resource
-def get_connection():
-    """Get database connection."""
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
-
-
-@st.cache_data(ttl=300)
-def load_projects():
-    """Load all projects from database."""
-    conn = get_connection()
-    query = """
-        SELECT p.*, fa.capex_per_mw, fa.capacity_factor, fa.electricity_price_mwh,
-               fa.discount_rate, fa.debt_ratio,
+def prepare_database():
+    """Switch the database to WAL and ensure project_id indexes and views exist."""
+    conn = sqlite3.connect(DB_PATH)
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+
+        CREATE INDEX IF NOT EXISTS idx_acf_pid ON annual_cash_flows(project_id);
+        CREATE INDEX IF NOT EXISTS idx_mg_pid ON monthly_generation(project_id);
+        CREATE INDEX IF NOT EXISTS idx_fa_pid ON financial_assumptions(project_id);
+        CREATE INDEX IF NOT EXISTS idx_km_pid ON key_metrics(project_id);
+
+        CREATE VIEW IF NOT EXISTS v_project_full AS
+        SELECT p.*,
+               fa.capex_per_mw, fa.opex_per_mw_year, fa.capacity_factor, fa.degradation_rate,
+               fa.electricity_price_mwh, fa.price_escalation_rate, fa.discount_rate,
+               fa.debt_ratio, fa.interest_rate, fa.loan_tenor_years, fa.tax_rate,
+               fa.depreciation_years,
                km.total_capex, km.npv, km.irr, km.payback_period_years, km.lcoe,
                km.dscr_min, km.dscr_avg, km.equity_irr, km.total_generation_gwh,
                km.carbon_offset_tonnes
         FROM projects p
         LEFT JOIN financial_assumptions fa ON p.id = fa.project_id
+        LEFT JOIN key_metrics km ON p.id = km.project_id;
+    """)
+    conn.close()
+
+
+@st.cache_resource
+def get_engine():
+    """Get a pooled, read-only database engine."""
+    prepare_database()
+    # as_uri() percent-encodes the path, so spaces, "#", "?" and "%" survive the URI
+    db_uri = DB_PATH.resolve().as_uri() + "?mode=ro"
+    engine = create_engine(
+        "sqlite://",
+        creator=lambda: sqlite3.connect(db_uri, uri=True, check_same_thread=False),
+        poolclass=QueuePool,
+        pool_size=4,
+        max_overflow=8,
+    )
+
+    @event.listens_for(engine, "connect")
+    def tune_connection(dbapi_conn, connection_record):
+        dbapi_conn.executescript("""
+            PRAGMA cache_size=-65536;
+            PRAGMA mmap_size=268435456;
+            PRAGMA temp_store=MEMORY;
+        """)
+
+    return engine
+
+
+@st.cache_data(ttl=300)
+def load_projects_summary():
+    """Load the project columns used by the portfolio-level pages."""
+    engine = get_engine()
+    query = """
+        SELECT id, name, project_type, location, country, status, capacity_mw,
+               total_capex, npv, irr, lcoe, payback_period_years,
+               dscr_min, dscr_avg, total_generation_gwh
+        FROM v_project_full
+    """
+    dtype = {"project_type": "category", "status": "category", "country": "category"}
+    return pd.read_sql_query(query, engine, dtype=dtype)
+
+
+@st.cache_data(ttl=300)
+def load_project_detail(project_id):
+    """Load the full record for a single project."""
+    engine = get_engine()
+    query = "SELECT * FROM v_project_full WHERE id = ?"
+    return pd.read_sql_query(query, engine, params=(project_id,)).iloc[0]
+
+
+def read_queries(queries, params=()):
+    """Run several SELECTs on one pooled connection inside a single read transaction."""
+    frames = {}
+    conn = get_engine().raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        for name, query in queries.items():
+            cursor.execute(query, params)
+            columns = [d[0] for d in cursor.description]
+            frames[name] = pd.DataFrame(cursor.fetchall(), columns=columns)
+        conn.commit()
+    finally:
+        conn.close()
+    return frames
+
+
+@st.cache_resource(ttl=300)
+def preload_tables():
+    """Load the per-project tables once and partition them by project_id."""
+    frames = read_queries({
+        "cash_flows": "SELECT * FROM annual_cash_flows",
+        "monthly_generation": "SELECT * FROM monthly_generation",
+    })
+    frames["monthly_generation"] = to_float32(frames["monthly_generation"])
+    add_date_column(frames["monthly_generation"])
+    return {
+        name: {
+            "all": df,
+            "by_project": {int(pid): group for pid, group in df.groupby("project_id")},
+        }
+        for name, df in frames.items()
+    }
+
+
+@st.cache_data(ttl=300)
+def load_projects_page(page, page_size=PROJECTS_PAGE_SIZE):
+    """Load one page of the projects table columns, ordered by project id."""
+    engine = get_engine()
+    query = """
+        SELECT name, project_type, location, country, capacity_mw,
+               status, irr, npv, lcoe, payback_period_years
+        FROM v_project_full
+        ORDER BY id
+        LIMIT ? OFFSET ?
+    """
+    return pd.read_sql_query(query, engine, params=(page_size, page * page_size))
+
+
+def to_float32(df):
+    """Downcast float64 columns to float32 to halve chart payloads."""
+    return df.astype({c: "float32" for c in df.select_dtypes("float64").columns})
+
+
+def placeholders(values):
+    """Build a comma-separated list of SQL parameter markers for values."""
+    return ", ".join("?" for _ in values)
+
+
+@st.cache_data(ttl=300)
+def load_portfolio_kpis():
+    """Load portfolio-level totals and averages."""
+    engine = get_engine()
+    query = """
+        SELECT SUM(p.capacity_mw) AS total_capacity,
+               SUM(km.total_capex) AS total_capex,
+               AVG(km.irr) AS avg_irr,
+               SUM(km.carbon_offset_tonnes) AS total_carbon
+        FROM projects p
         LEFT JOIN key_metrics km ON p.id = km.project_id
     """
-    return pd.read_sql_query(query, conn)
+    return pd.read_sql_query(query, engine).astype(float).iloc[0]
+
+
+@st.cache_data(ttl=300)
+def load_capacity_by_type():
+    """Load total capacity per technology."""
+    engine = get_engine()
+    query = """
+        SELECT project_type, SUM(capacity_mw) AS capacity_mw
+        FROM projects
+        GROUP BY project_type
+    """
+    return pd.read_sql_query(query, engine)
+
+
+@st.cache_data(ttl=300)
+def load_status_counts():
+    """Load number of projects per status."""
+    engine = get_engine()
+    query = """
+        SELECT status, COUNT(*) AS count
+        FROM projects
+        GROUP BY status
+        ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, engine)
+
+
+@st.cache_data(ttl=300)
+def load_weighted_metrics(types, statuses):
+    """Load summary metrics for projects matching the given types and statuses."""
+    engine = get_engine()
+    query = f"""
+        SELECT COUNT(*) AS project_count,
+               COALESCE(SUM(km.npv), 0) AS total_npv,
+               SUM(km.irr * km.total_capex) / SUM(km.total_capex) AS weighted_irr,
+               SUM(km.lcoe * p.capacity_mw) / SUM(p.capacity_mw) AS weighted_lcoe
+        FROM projects p
+        LEFT JOIN key_metrics km ON p.id = km.project_id
+        WHERE p.project_type IN ({placeholders(types)})
+          AND p.status IN ({placeholders(statuses)})
+    """
+    params = (*types, *statuses)
+    return pd.read_sql_query(query, engine, params=params).astype(float).iloc[0]
 
 
 @st.cache_data(ttl=300)
 def load_cash_flows(project_id=None):
     """Load cash flows for projects."""
-    conn = get_connection()
+    cash_flows = preload_tables()["cash_flows"]
     if project_id:
-        query = "SELECT * FROM annual_cash_flows WHERE project_id = ?"
-        return pd.read_sql_query(query, conn, params=(project_id,))
-    return pd.read_sql_query("SELECT * FROM annual_cash_flows", conn)
+        return cash_flows["by_project"].get(project_id, cash_flows["all"].iloc[:0])
+    return cash_flows["all"]
 
 
 @st.cache_data(ttl=300)
 def load_monthly_generation(project_id=None):
     """Load monthly generation data."""
-    conn = get_connection()
+    monthly_generation = preload_tables()["monthly_generation"]
     if project_id:
-        query = "SELECT * FROM monthly_generation WHERE project_id = ?"
-        return pd.read_sql_query(query, conn, params=(project_id,))
-    return pd.read_sql_query("SELECT * FROM monthly_generation", conn)
+        return monthly_generation["by_project"].get(project_id, monthly_generation["all"].iloc[:0])
+    return monthly_generation["all"]
+
+
+def add_date_column(df):
+    """Add a month-start date column derived from year and month."""
+    df["date"] = pd.to_datetime(dict(year=df["year"], month=df["month"], day=1))
+    return df
 
 
 @st.cache_data(ttl=300)
 def load_market_data():
     """Load market price data."""
-    conn = get_connection()
-    return pd.read_sql_query("SELECT * FROM market_data", conn)
+    engine = get_engine()
+    df = pd.read_sql_query("SELECT * FROM market_data", engine,
+                           dtype={"region": "category"}, parse_dates=["date"])
+    return to_float32(df)
+
+
+@st.cache_data(ttl=300)
+def load_market_prices(regions, limit=1000):
+    """Load a random sample of wholesale and PPA prices for the given regions."""
+    engine = get_engine()
+    query = f"""
+        SELECT date, region, wholesale_price_mwh, ppa_price_mwh
+        FROM market_data
+        WHERE region IN ({placeholders(regions)})
+        ORDER BY RANDOM()
+        LIMIT ?
+    """
+    dtype = {"region": "category", "wholesale_price_mwh": "float32", "ppa_price_mwh": "float32"}
+    return pd.read_sql_query(query, engine, params=(*regions, limit),
+                             dtype=dtype, parse_dates=["date"])
+
+
+@st.cache_data(ttl=300)
+def load_monthly_carbon(regions):
+    """Load monthly average carbon prices for the given regions."""
+    engine = get_engine()
+    query = f"""
+        SELECT strftime('%Y-%m-01', date) AS date, region, AVG(carbon_price) AS carbon_price
+        FROM market_data
+        WHERE region IN ({placeholders(regions)})
+        GROUP BY strftime('%Y-%m-01', date), region
+        ORDER BY date, region
+    """
+    return pd.read_sql_query(query, engine, params=tuple(regions),
+                             dtype={"region": "category"}, parse_dates=["date"])
 
 
 @st.cache_data(ttl=300)
 def load_technology_benchmarks():
     """Load technology benchmark data."""
-    conn = get_connection()
-    return pd.read_sql_query("SELECT * FROM technology_benchmarks", conn)
+    engine = get_engine()
+    return pd.read_sql_query("SELECT * FROM technology_benchmarks", engine)
+
+
+@st.cache_resource(ttl=300)
+def build_waterfalls(project_id):
+    """Build the annual cash-flow waterfall trace for every year of a project."""
+    cash_flows = load_cash_flows(project_id)
+    return {
+        int(row.year): go.Waterfall(
+            name="Cash Flow",
+            orientation="v",
+            measure=["relative", "relative", "total", "relative", "relative", "relative", "relative", "total"],
+            x=["Revenue", "OPEX", "EBITDA", "Depreciation", "Interest", "Tax", "Principal", "FCF"],
+            y=[row.revenue, -row.opex, row.ebitda,
+               -row.depreciation, -row.interest_expense,
+               -row.tax, -row.principal_repayment, row.free_cash_flow],
+            connector={"line": {"color": "rgb(63, 63, 63)"}},
+            increasing={"marker": {"color": "#28A745"}},
+            decreasing={"marker": {"color": "#DC3545"}},
+            totals={"marker": {"color": "#007BFF"}}
+        )
+        for row in cash_flows.itertuples(index=False)
+    }
 
 
 def format_currency(value, prefix="$", suffix=""):
@@ -116,6 +354,514 @@ def format_currency(value, prefix="$", suffix=""):
     return f"{prefix}{value:.0f}{suffix}"
 
 
+def format_currency_series(values, prefix="$", suffix=""):
+    """Format a numeric Series as currency, matching format_currency."""
+    magnitude = values.abs().to_numpy(dtype=float)
+    thresholds = [magnitude >= 1e9, magnitude >= 1e6, magnitude >= 1e3]
+    scale = np.select(thresholds, [1e9, 1e6, 1e3], default=1.0)
+    unit = np.select(thresholds, ["B", "M", "K"], default="")
+    scaled = values.to_numpy(dtype=float) / scale
+    number = np.where(magnitude >= 1e3, np.char.mod("%.1f", scaled), np.char.mod("%.0f", scaled))
+    formatted = prefix + pd.Series(np.char.add(number, unit), index=values.index) + suffix
+    return formatted.where(values.notna(), "N/A")
+
+
+def monthly_mean(months, values):
+    """Average values by calendar month (1-12); months with no data are NaN."""
+    totals = np.bincount(months - 1, weights=values, minlength=12)
+    counts = np.bincount(months - 1, minlength=12)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return totals / counts
+
+
+def downsample_lttb(df, x, y, n_out=MAX_PLOT_POINTS):
+    """Reduce a sorted series to n_out rows using Largest-Triangle-Three-Buckets."""
+    n = len(df)
+    if n <= n_out or n_out < 3:
+        return df
+
+    xs = df[x].to_numpy()
+    if np.issubdtype(xs.dtype, np.datetime64):
+        xs = xs.astype("int64")
+    xs = xs.astype("float64")
+    ys = df[y].to_numpy(dtype="float64")
+
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[end:next_end].mean()
+        avg_y = ys[end:next_end].mean()
+        area = np.abs(
+            (xs[a] - avg_x) * (ys[start:end] - ys[a])
+            - (xs[a] - xs[start:end]) * (avg_y - ys[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    selected[-1] = n - 1
+
+    return df.iloc[selected]
+
+
+def filter_projects(types, statuses):
+    """Return the project summary rows matching the given types and statuses."""
+    projects = load_projects_summary()
+    return projects[
+        (projects["project_type"].isin(types)) &
+        (projects["status"].isin(statuses))
+    ]
+
+
+def filter_market_data(regions):
+    """Return the market data rows for the given regions."""
+    market_data = load_market_data()
+    return market_data[market_data["region"].isin(regions)]
+
+
+@st.cache_resource(ttl=300)
+def fig_capacity_by_type():
+    """Build the capacity-by-technology donut chart."""
+    capacity_by_type = load_capacity_by_type()
+    fig = go.Figure(go.Pie(
+        labels=capacity_by_type["project_type"].to_numpy(),
+        values=capacity_by_type["capacity_mw"].to_numpy(dtype=np.float32),
+        hole=0.4,
+        marker=dict(colors=px.colors.qualitative.Set2)
+    ))
+    fig.update_layout(margin=dict(t=20, b=20, l=20, r=20))
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_projects_by_status():
+    """Build the projects-by-status bar chart."""
+    status_counts = load_status_counts()
+    colors = cycle(px.colors.qualitative.Pastel)
+    fig = go.Figure(go.Bar(
+        x=status_counts["status"].to_numpy(),
+        y=status_counts["count"].to_numpy(),
+        marker_color=[next(colors) for _ in range(len(status_counts))]
+    ))
+    fig.update_layout(
+        xaxis_title="status",
+        yaxis_title="count",
+        showlegend=False,
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_irr_vs_npv():
+    """Build the IRR vs NPV bubble chart."""
+    projects = load_projects_summary()
+    sizeref = projects["capacity_mw"].max() / BUBBLE_SIZE_MAX ** 2
+    fig = go.Figure()
+    groups = projects.groupby("project_type", observed=True, sort=False)
+    for color, (project_type, group) in zip(cycle(px.colors.qualitative.Set1), groups):
+        fig.add_trace(go.Scattergl(
+            x=group["npv"].to_numpy(dtype=np.float32),
+            y=group["irr"].to_numpy(dtype=np.float32) * 100,
+            mode="markers",
+            name=project_type,
+            hovertext=group["name"].to_numpy(),
+            marker=dict(color=color, size=group["capacity_mw"].to_numpy(dtype=np.float32),
+                        sizemode="area", sizeref=sizeref)
+        ))
+    fig.add_hline(y=8, line_dash="dash", line_color="gray", annotation_text="8% Hurdle Rate")
+    fig.update_layout(
+        xaxis_title="NPV ($)",
+        yaxis_title="IRR (%)",
+        legend_title_text="project_type",
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_lcoe_by_technology():
+    """Build the LCOE-by-technology box plot."""
+    projects = load_projects_summary()
+    fig = go.Figure()
+    groups = projects.groupby("project_type", observed=True, sort=False)
+    for color, (project_type, group) in zip(cycle(px.colors.qualitative.Set2), groups):
+        fig.add_trace(go.Box(y=group["lcoe"].to_numpy(dtype=np.float32), name=project_type,
+                             marker_color=color))
+    fig.update_layout(
+        xaxis_title="Technology",
+        yaxis_title="LCOE ($/MWh)",
+        showlegend=False,
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_revenue_ebitda(project_id):
+    """Build the annual revenue and EBITDA bar chart for a project."""
+    cash_flows = load_cash_flows(project_id)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=cash_flows["year"], y=cash_flows["revenue"],
+                         name="Revenue", marker_color="#2E86AB"))
+    fig.add_trace(go.Bar(x=cash_flows["year"], y=cash_flows["ebitda"],
+                         name="EBITDA", marker_color="#A23B72"))
+    fig.update_layout(
+        title="Revenue & EBITDA",
+        xaxis_title="Year",
+        yaxis_title="Amount ($)",
+        barmode="group",
+        margin=dict(t=40, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_cumulative_cash_flow(project_id):
+    """Build the cumulative cash flow chart for a project."""
+    cumulative = downsample_lttb(load_cash_flows(project_id), "year", "cumulative_cash_flow")
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=cumulative["year"],
+        y=cumulative["cumulative_cash_flow"],
+        mode="lines+markers",
+        name="Cumulative Cash Flow",
+        line=dict(color="#28A745", width=3),
+        fill="tozeroy"
+    ))
+    fig.add_hline(y=0, line_dash="dash", line_color="red")
+    fig.update_layout(
+        title="Cumulative Cash Flow",
+        xaxis_title="Year",
+        yaxis_title="Cumulative Cash Flow ($)",
+        margin=dict(t=40, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_cash_flow_waterfall(project_id, year):
+    """Build the cash flow waterfall chart for one project year."""
+    fig = go.Figure(build_waterfalls(project_id)[year])
+    fig.update_layout(
+        title=f"Year {year} Cash Flow Waterfall",
+        showlegend=False,
+        margin=dict(t=40, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_irr_distribution(types, statuses):
+    """Build the IRR histogram for the filtered projects."""
+    filtered = filter_projects(types, statuses)
+    fig = go.Figure()
+    groups = filtered.groupby("project_type", observed=True, sort=False)
+    for color, (project_type, group) in zip(cycle(px.colors.qualitative.Set2), groups):
+        fig.add_trace(go.Histogram(
+            x=group["irr"].to_numpy() * 100,
+            nbinsx=15,
+            bingroup="irr",
+            name=project_type,
+            marker_color=color
+        ))
+    fig.add_vline(x=8, line_dash="dash", line_color="red", annotation_text="Hurdle Rate")
+    fig.update_layout(
+        barmode="relative",
+        xaxis_title="IRR (%)",
+        yaxis_title="count",
+        legend_title_text="project_type",
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_payback_distribution(types, statuses):
+    """Build the payback period histogram for the filtered projects."""
+    filtered = filter_projects(types, statuses)
+    fig = go.Figure()
+    groups = filtered.groupby("project_type", observed=True, sort=False)
+    for color, (project_type, group) in zip(cycle(px.colors.qualitative.Set2), groups):
+        fig.add_trace(go.Histogram(
+            x=group["payback_period_years"].to_numpy(),
+            nbinsx=15,
+            bingroup="payback",
+            name=project_type,
+            marker_color=color
+        ))
+    fig.update_layout(
+        barmode="relative",
+        xaxis_title="Payback Period (years)",
+        yaxis_title="count",
+        legend_title_text="project_type",
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_dscr(types, statuses):
+    """Build the minimum vs average DSCR chart for the filtered projects."""
+    filtered = filter_projects(types, statuses)
+    sizeref = filtered["total_capex"].max() / BUBBLE_SIZE_MAX ** 2
+    fig = go.Figure()
+    groups = filtered.groupby("project_type", observed=True, sort=False)
+    for color, (project_type, group) in zip(cycle(px.colors.qualitative.Set1), groups):
+        fig.add_trace(go.Scattergl(
+            x=group["dscr_min"].to_numpy(),
+            y=group["dscr_avg"].to_numpy(),
+            mode="markers",
+            name=project_type,
+            hovertext=group["name"].to_numpy(),
+            marker=dict(color=color, size=group["total_capex"].to_numpy(),
+                        sizemode="area", sizeref=sizeref)
+        ))
+    fig.add_hline(y=1.3, line_dash="dash", line_color="orange", annotation_text="Min Covenant (1.3x)")
+    fig.add_vline(x=1.2, line_dash="dash", line_color="red", annotation_text="Min Threshold")
+    fig.update_layout(
+        xaxis_title="Minimum DSCR",
+        yaxis_title="Average DSCR",
+        legend_title_text="project_type",
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_capex_efficiency(types, statuses):
+    """Build the CAPEX vs lifetime generation chart for the filtered projects."""
+    filtered = filter_projects(types, statuses)
+    sizeref = filtered["capacity_mw"].max() / BUBBLE_SIZE_MAX ** 2
+    fig = go.Figure()
+    groups = filtered.groupby("project_type", observed=True, sort=False)
+    for color, (project_type, group) in zip(cycle(px.colors.qualitative.Set1), groups):
+        fig.add_trace(go.Scattergl(
+            x=group["total_capex"].to_numpy(),
+            y=group["total_generation_gwh"].to_numpy(),
+            mode="markers",
+            name=project_type,
+            hovertext=group["name"].to_numpy(),
+            marker=dict(color=color, size=group["capacity_mw"].to_numpy(),
+                        sizemode="area", sizeref=sizeref)
+        ))
+    fig.update_layout(
+        xaxis_title="Total CAPEX ($)",
+        yaxis_title="Lifetime Generation (GWh)",
+        legend_title_text="project_type",
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_monthly_generation(project_id):
+    """Build the monthly generation trend for a project."""
+    monthly_data = load_monthly_generation(project_id)
+    fig = px.line(
+        downsample_lttb(monthly_data, "date", "generation_mwh"),
+        x="date",
+        y="generation_mwh",
+        labels={"date": "Date", "generation_mwh": "Generation (MWh)"},
+        color_discrete_sequence=["#2E86AB"]
+    )
+    fig.update_layout(margin=dict(t=20, b=20))
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_capacity_factor_by_month(project_id):
+    """Build the average capacity factor by calendar month for a project."""
+    monthly_data = load_monthly_generation(project_id)
+    monthly_avg = pd.DataFrame({
+        "month_name": MONTH_NAMES,
+        "capacity_factor": monthly_mean(
+            monthly_data["month"].to_numpy(dtype=int),
+            monthly_data["capacity_factor"].to_numpy(dtype=float),
+        ),
+    }).dropna()
+    fig = px.bar(
+        monthly_avg,
+        x="month_name",
+        y=monthly_avg["capacity_factor"] * 100,
+        labels={"month_name": "Month", "y": "Capacity Factor (%)"},
+        color_discrete_sequence=["#28A745"]
+    )
+    fig.update_layout(margin=dict(t=20, b=20))
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_generation_heatmap(project_id):
+    """Build the month x year generation heatmap for a project."""
+    monthly_data = load_monthly_generation(project_id)
+    pivot_data = (
+        monthly_data.groupby(["year", "month"])["generation_mwh"].sum()
+        .unstack("month")
+        .reindex(columns=range(1, 13))
+    )
+    pivot_data.columns = MONTH_NAMES
+
+    fig = px.imshow(
+        pivot_data,
+        labels=dict(x="Month", y="Year", color="Generation (MWh)"),
+        color_continuous_scale="Greens",
+        aspect="auto"
+    )
+    fig.update_layout(margin=dict(t=20, b=20))
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_wholesale_trend(regions):
+    """Build the daily wholesale price trend for the given regions."""
+    filtered = filter_market_data(regions)
+    price_trend = filtered
+    if not filtered.empty:
+        price_trend = pd.concat([
+            downsample_lttb(region_data, "date", "wholesale_price_mwh")
+            for _, region_data in filtered.groupby("region", observed=True)
+        ])
+    fig = px.line(
+        price_trend,
+        x="date",
+        y="wholesale_price_mwh",
+        color="region",
+        labels={"date": "Date", "wholesale_price_mwh": "Price ($/MWh)", "region": "Region"},
+        color_discrete_sequence=px.colors.qualitative.Set1
+    )
+    fig.update_layout(margin=dict(t=20, b=20))
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_ppa_vs_wholesale(regions):
+    """Build the PPA vs wholesale price scatter for the given regions."""
+    fig = px.scatter(
+        load_market_prices(regions),
+        x="wholesale_price_mwh",
+        y="ppa_price_mwh",
+        color="region",
+        labels={"wholesale_price_mwh": "Wholesale Price ($/MWh)",
+                "ppa_price_mwh": "PPA Price ($/MWh)"},
+        color_discrete_sequence=px.colors.qualitative.Set2,
+        render_mode="webgl"
+    )
+    fig.add_trace(go.Scattergl(x=[0, 150], y=[0, 150], mode="lines",
+                               name="Parity", line=dict(dash="dash", color="gray")))
+    fig.update_layout(margin=dict(t=20, b=20))
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_carbon_trend(regions):
+    """Build the monthly carbon price trend for the given regions."""
+    fig = px.line(
+        load_monthly_carbon(regions),
+        x="date",
+        y="carbon_price",
+        color="region",
+        labels={"date": "Date", "carbon_price": "Carbon Price ($/tonne)"},
+        color_discrete_sequence=px.colors.qualitative.Set1
+    )
+    fig.update_layout(margin=dict(t=20, b=20))
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_lcoe_trends():
+    """Build the benchmark LCOE trend by technology."""
+    benchmarks = load_technology_benchmarks()
+    fig = go.Figure()
+    groups = benchmarks.groupby("technology", sort=False)
+    for color, (technology, group) in zip(cycle(px.colors.qualitative.Set1), groups):
+        fig.add_trace(go.Scatter(
+            x=group["year"].to_numpy(),
+            y=group["avg_lcoe"].to_numpy(),
+            mode="lines+markers",
+            name=technology,
+            line=dict(color=color)
+        ))
+    fig.update_layout(
+        xaxis_title="Year",
+        yaxis_title="LCOE ($/MWh)",
+        legend_title_text="Technology",
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_capex_trends():
+    """Build the benchmark CAPEX trend by technology."""
+    benchmarks = load_technology_benchmarks()
+    fig = go.Figure()
+    groups = benchmarks.groupby("technology", sort=False)
+    for color, (technology, group) in zip(cycle(px.colors.qualitative.Set2), groups):
+        fig.add_trace(go.Scatter(
+            x=group["year"].to_numpy(),
+            y=group["avg_capex_per_mw"].to_numpy(),
+            mode="lines+markers",
+            name=technology,
+            line=dict(color=color)
+        ))
+    fig.update_layout(
+        xaxis_title="Year",
+        yaxis_title="CAPEX ($/MW)",
+        legend_title_text="Technology",
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_capacity_factor_trends():
+    """Build the benchmark capacity factor trend by technology."""
+    benchmarks = load_technology_benchmarks()
+    fig = go.Figure()
+    groups = benchmarks.groupby("technology", sort=False)
+    for color, (technology, group) in zip(cycle(px.colors.qualitative.Set2), groups):
+        fig.add_trace(go.Scatter(
+            x=group["year"].to_numpy(),
+            y=group["avg_capacity_factor"].to_numpy() * 100,
+            mode="lines+markers",
+            name=technology,
+            line=dict(color=color)
+        ))
+    fig.update_layout(
+        xaxis_title="Year",
+        yaxis_title="Capacity Factor (%)",
+        legend_title_text="Technology",
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=300)
+def fig_learning_rates():
+    """Build the learning rate bar chart by technology."""
+    benchmarks = load_technology_benchmarks()
+    learning_rates = benchmarks.groupby("technology")["learning_rate"].first().reset_index()
+    learning_rates["learning_rate"] = learning_rates["learning_rate"] * 100
+
+    colors = cycle(px.colors.qualitative.Pastel)
+    fig = go.Figure(go.Bar(
+        x=learning_rates["technology"].to_numpy(),
+        y=learning_rates["learning_rate"].to_numpy(),
+        marker_color=[next(colors) for _ in range(len(learning_rates))]
+    ))
+    fig.update_layout(
+        xaxis_title="Technology",
+        yaxis_title="Learning Rate (%)",
+        showlegend=False,
+        margin=dict(t=20, b=20)
+    )
+    return fig
+
+
 def main():
     """Main application."""
     # Sidebar
@@ -129,9 +875,17 @@ def main():
          "Generation Analytics", "Market Analysis", "Technology Trends"]
     )
 
+    # Market pages don't use the project list, so skip loading it for them
+    if page == "Market Analysis":
+        show_market_analysis()
+        return
+    if page == "Technology Trends":
+        show_technology_trends()
+        return
+
     # Load data
     try:
-        projects = load_projects()
+        projects = load_projects_summary()
     except Exception as e:
         st.error(f"Database not found. Please run init_database.py first.\n\nError: {e}")
         st.code("python analytics/init_database.py", language="bash")
@@ -145,10 +899,6 @@ def main():
         show_financial_analysis(projects)
     elif page == "Generation Analytics":
         show_generation_analytics(projects)
-    elif page == "Market Analysis":
-        show_market_analysis()
-    elif page == "Technology Trends":
-        show_technology_trends()
 
 
 def show_portfolio_overview(projects):
@@ -159,10 +909,11 @@ def show_portfolio_overview(projects):
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
 
-    total_capacity = projects["capacity_mw"].sum()
-    total_capex = projects["total_capex"].sum()
-    avg_irr = projects["irr"].mean() * 100
-    total_carbon = projects["carbon_offset_tonnes"].sum()
+    kpis = load_portfolio_kpis()
+    total_capacity = kpis["total_capacity"]
+    total_capex = kpis["total_capex"]
+    avg_irr = kpis["avg_irr"] * 100
+    total_carbon = kpis["total_carbon"]
 
     with col1:
         st.metric("Total Capacity", f"{total_capacity:,.0f} MW")
@@ -180,70 +931,39 @@ def show_portfolio_overview(projects):
 
     with col1:
         st.subheader("Capacity by Technology")
-        capacity_by_type = projects.groupby("project_type")["capacity_mw"].sum().reset_index()
-        fig = px.pie(
-            capacity_by_type,
-            values="capacity_mw",
-            names="project_type",
-            hole=0.4,
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig.update_layout(margin=dict(t=20, b=20, l=20, r=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_capacity_by_type(), use_container_width=True)
 
     with col2:
         st.subheader("Projects by Status")
-        status_counts = projects["status"].value_counts().reset_index()
-        status_counts.columns = ["status", "count"]
-        fig = px.bar(
-            status_counts,
-            x="status",
-            y="count",
-            color="status",
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        fig.update_layout(showlegend=False, margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_projects_by_status(), use_container_width=True)
 
     # Charts row 2
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("IRR vs NPV by Project")
-        fig = px.scatter(
-            projects,
-            x="npv",
-            y=projects["irr"] * 100,
-            size="capacity_mw",
-            color="project_type",
-            hover_name="name",
-            labels={"npv": "NPV ($)", "y": "IRR (%)"},
-            color_discrete_sequence=px.colors.qualitative.Set1
-        )
-        fig.add_hline(y=8, line_dash="dash", line_color="gray", annotation_text="8% Hurdle Rate")
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_irr_vs_npv(), use_container_width=True)
 
     with col2:
         st.subheader("LCOE by Technology")
-        fig = px.box(
-            projects,
-            x="project_type",
-            y="lcoe",
-            color="project_type",
-            labels={"lcoe": "LCOE ($/MWh)", "project_type": "Technology"},
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig.update_layout(showlegend=False, margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_lcoe_by_technology(), use_container_width=True)
 
     # Projects table
     st.subheader("All Projects")
-    display_cols = ["name", "project_type", "location", "country", "capacity_mw",
-                    "status", "irr", "npv", "lcoe", "payback_period_years"]
-    display_df = projects[display_cols].copy()
+    show_projects_table(len(projects))
+
+
+@st.fragment
+def show_projects_table(num_projects):
+    """Display one page of the projects table."""
+    num_pages = max(1, math.ceil(num_projects / PROJECTS_PAGE_SIZE))
+    page = 1
+    if num_pages > 1:
+        page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, value=1, step=1)
+
+    display_df = load_projects_page(page - 1)
     display_df["irr"] = (display_df["irr"] * 100).round(1).astype(str) + "%"
-    display_df["npv"] = display_df["npv"].apply(lambda x: format_currency(x))
+    display_df["npv"] = format_currency_series(display_df["npv"])
     display_df.columns = ["Project", "Type", "Location", "Country", "Capacity (MW)",
                           "Status", "IRR", "NPV", "LCOE", "Payback (yrs)"]
     st.dataframe(display_df, use_container_width=True, hide_index=True)
@@ -261,8 +981,8 @@ def show_project_details(projects):
         index=0
     )
 
-    project = projects[projects["name"] == project_name].iloc[0]
-    project_id = project["id"]
+    project_id = int(projects.loc[projects["name"] == project_name, "id"].iloc[0])
+    project = load_project_detail(project_id)
 
     # Project info cards
     col1, col2, col3 = st.columns(3)
@@ -307,65 +1027,20 @@ def show_project_details(projects):
         col1, col2 = st.columns(2)
 
         with col1:
-            # Revenue and EBITDA chart
-            fig = go.Figure()
-            fig.add_trace(go.Bar(x=cash_flows["year"], y=cash_flows["revenue"],
-                                  name="Revenue", marker_color="#2E86AB"))
-            fig.add_trace(go.Bar(x=cash_flows["year"], y=cash_flows["ebitda"],
-                                  name="EBITDA", marker_color="#A23B72"))
-            fig.update_layout(
-                title="Revenue & EBITDA",
-                xaxis_title="Year",
-                yaxis_title="Amount ($)",
-                barmode="group",
-                margin=dict(t=40, b=20)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig_revenue_ebitda(project_id), use_container_width=True)
 
         with col2:
-            # Cumulative cash flow
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=cash_flows["year"],
-                y=cash_flows["cumulative_cash_flow"],
-                mode="lines+markers",
-                name="Cumulative Cash Flow",
-                line=dict(color="#28A745", width=3),
-                fill="tozeroy"
-            ))
-            fig.add_hline(y=0, line_dash="dash", line_color="red")
-            fig.update_layout(
-                title="Cumulative Cash Flow",
-                xaxis_title="Year",
-                yaxis_title="Cumulative Cash Flow ($)",
-                margin=dict(t=40, b=20)
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Cash flow waterfall
-        st.subheader("Annual Cash Flow Breakdown")
-        year_select = st.slider("Select Year", 1, len(cash_flows), 5)
-        year_data = cash_flows[cash_flows["year"] == year_select].iloc[0]
-
-        fig = go.Figure(go.Waterfall(
-            name="Cash Flow",
-            orientation="v",
-            measure=["relative", "relative", "total", "relative", "relative", "relative", "relative", "total"],
-            x=["Revenue", "OPEX", "EBITDA", "Depreciation", "Interest", "Tax", "Principal", "FCF"],
-            y=[year_data["revenue"], -year_data["opex"], year_data["ebitda"],
-               -year_data["depreciation"], -year_data["interest_expense"],
-               -year_data["tax"], -year_data["principal_repayment"], year_data["free_cash_flow"]],
-            connector={"line": {"color": "rgb(63, 63, 63)"}},
-            increasing={"marker": {"color": "#28A745"}},
-            decreasing={"marker": {"color": "#DC3545"}},
-            totals={"marker": {"color": "#007BFF"}}
-        ))
-        fig.update_layout(
-            title=f"Year {year_select} Cash Flow Waterfall",
-            showlegend=False,
-            margin=dict(t=40, b=20)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig_cumulative_cash_flow(project_id), use_container_width=True)
+
+        show_cash_flow_waterfall(project_id, len(cash_flows))
+
+
+@st.fragment
+def show_cash_flow_waterfall(project_id, num_years):
+    """Display the annual cash flow waterfall for a selected year."""
+    st.subheader("Annual Cash Flow Breakdown")
+    year_select = st.slider("Select Year", 1, num_years, 5)
+    st.plotly_chart(fig_cash_flow_waterfall(project_id, year_select), use_container_width=True)
 
 
 def show_financial_analysis(projects):
@@ -373,6 +1048,12 @@ def show_financial_analysis(projects):
     st.title("💰 Financial Analysis")
     st.markdown("---")
 
+    show_financial_charts(projects)
+
+
+@st.fragment
+def show_financial_charts(projects):
+    """Display the filtered financial summary and comparison charts."""
     # Filter options
     col1, col2 = st.columns(2)
     with col1:
@@ -388,25 +1069,22 @@ def show_financial_analysis(projects):
             default=projects["status"].unique().tolist()
         )
 
-    filtered = projects[
-        (projects["project_type"].isin(selected_types)) &
-        (projects["status"].isin(selected_status))
-    ]
+    types = tuple(selected_types)
+    statuses = tuple(selected_status)
 
     # Summary metrics
     st.subheader("Portfolio Summary")
     col1, col2, col3, col4 = st.columns(4)
+    summary = load_weighted_metrics(types, statuses)
 
     with col1:
-        st.metric("Projects", len(filtered))
+        st.metric("Projects", int(summary["project_count"]))
     with col2:
-        st.metric("Total NPV", format_currency(filtered["npv"].sum()))
+        st.metric("Total NPV", format_currency(summary["total_npv"]))
     with col3:
-        weighted_irr = (filtered["irr"] * filtered["total_capex"]).sum() / filtered["total_capex"].sum()
-        st.metric("Weighted Avg IRR", f"{weighted_irr*100:.1f}%")
+        st.metric("Weighted Avg IRR", f"{summary['weighted_irr']*100:.1f}%")
     with col4:
-        weighted_lcoe = (filtered["lcoe"] * filtered["capacity_mw"]).sum() / filtered["capacity_mw"].sum()
-        st.metric("Weighted Avg LCOE", f"${weighted_lcoe:.2f}/MWh")
+        st.metric("Weighted Avg LCOE", f"${summary['weighted_lcoe']:.2f}/MWh")
 
     st.markdown("---")
 
@@ -415,65 +1093,22 @@ def show_financial_analysis(projects):
 
     with col1:
         st.subheader("IRR Distribution")
-        fig = px.histogram(
-            filtered,
-            x=filtered["irr"] * 100,
-            nbins=15,
-            color="project_type",
-            labels={"x": "IRR (%)"},
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig.add_vline(x=8, line_dash="dash", line_color="red", annotation_text="Hurdle Rate")
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_irr_distribution(types, statuses), use_container_width=True)
 
     with col2:
         st.subheader("Payback Period Analysis")
-        fig = px.histogram(
-            filtered,
-            x="payback_period_years",
-            nbins=15,
-            color="project_type",
-            labels={"payback_period_years": "Payback Period (years)"},
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_payback_distribution(types, statuses), use_container_width=True)
 
     # DSCR analysis
     st.subheader("Debt Service Coverage Ratio (DSCR)")
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = px.scatter(
-            filtered,
-            x="dscr_min",
-            y="dscr_avg",
-            color="project_type",
-            size="total_capex",
-            hover_name="name",
-            labels={"dscr_min": "Minimum DSCR", "dscr_avg": "Average DSCR"},
-            color_discrete_sequence=px.colors.qualitative.Set1
-        )
-        fig.add_hline(y=1.3, line_dash="dash", line_color="orange", annotation_text="Min Covenant (1.3x)")
-        fig.add_vline(x=1.2, line_dash="dash", line_color="red", annotation_text="Min Threshold")
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_dscr(types, statuses), use_container_width=True)
 
     with col2:
         # CAPEX efficiency
-        fig = px.scatter(
-            filtered,
-            x="total_capex",
-            y="total_generation_gwh",
-            color="project_type",
-            size="capacity_mw",
-            hover_name="name",
-            labels={"total_capex": "Total CAPEX ($)", "total_generation_gwh": "Lifetime Generation (GWh)"},
-            color_discrete_sequence=px.colors.qualitative.Set1
-        )
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_capex_efficiency(types, statuses), use_container_width=True)
 
 
 def show_generation_analytics(projects):
@@ -481,6 +1116,12 @@ def show_generation_analytics(projects):
     st.title("⚡ Generation Analytics")
     st.markdown("---")
 
+    show_generation_charts(projects)
+
+
+@st.fragment
+def show_generation_charts(projects):
+    """Display generation metrics and charts for a selected project."""
     # Project selector
     project_name = st.selectbox(
         "Select Project",
@@ -489,7 +1130,7 @@ def show_generation_analytics(projects):
     )
 
     project = projects[projects["name"] == project_name].iloc[0]
-    project_id = project["id"]
+    project_id = int(project["id"])
 
     monthly_data = load_monthly_generation(project_id)
 
@@ -521,55 +1162,15 @@ def show_generation_analytics(projects):
 
     with col1:
         st.subheader("Monthly Generation Trend")
-        monthly_data["date"] = pd.to_datetime(
-            monthly_data["year"].astype(str) + "-" + monthly_data["month"].astype(str) + "-01"
-        )
-        fig = px.line(
-            monthly_data,
-            x="date",
-            y="generation_mwh",
-            labels={"date": "Date", "generation_mwh": "Generation (MWh)"},
-            color_discrete_sequence=["#2E86AB"]
-        )
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_monthly_generation(project_id), use_container_width=True)
 
     with col2:
         st.subheader("Capacity Factor by Month")
-        monthly_avg = monthly_data.groupby("month")["capacity_factor"].mean().reset_index()
-        monthly_avg["month_name"] = monthly_avg["month"].apply(
-            lambda x: ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
-                       "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"][x-1]
-        )
-        fig = px.bar(
-            monthly_avg,
-            x="month_name",
-            y=monthly_avg["capacity_factor"] * 100,
-            labels={"month_name": "Month", "y": "Capacity Factor (%)"},
-            color_discrete_sequence=["#28A745"]
-        )
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_capacity_factor_by_month(project_id), use_container_width=True)
 
     # Heatmap
     st.subheader("Generation Heatmap (Monthly x Yearly)")
-    pivot_data = monthly_data.pivot_table(
-        values="generation_mwh",
-        index="year",
-        columns="month",
-        aggfunc="sum"
-    )
-    pivot_data.columns = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
-                          "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-
-    fig = px.imshow(
-        pivot_data,
-        labels=dict(x="Month", y="Year", color="Generation (MWh)"),
-        color_continuous_scale="Greens",
-        aspect="auto"
-    )
-    fig.update_layout(margin=dict(t=20, b=20))
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig_generation_heatmap(project_id), use_container_width=True)
 
 
 def show_market_analysis():
@@ -583,66 +1184,37 @@ def show_market_analysis():
         st.warning("No market data available.")
         return
 
-    market_data["date"] = pd.to_datetime(market_data["date"])
+    show_market_charts(market_data["region"].unique().tolist())
 
-    # Region selector
-    regions = market_data["region"].unique().tolist()
-    selected_regions = st.multiselect("Select Regions", regions, default=regions[:3])
 
-    filtered = market_data[market_data["region"].isin(selected_regions)]
+@st.fragment
+def show_market_charts(regions):
+    """Display price charts and statistics for the selected regions."""
+    # Region selector
+    selected_regions = tuple(st.multiselect("Select Regions", regions, default=regions[:3]))
 
     # Price trends
     st.subheader("Wholesale Price Trends")
-    fig = px.line(
-        filtered,
-        x="date",
-        y="wholesale_price_mwh",
-        color="region",
-        labels={"date": "Date", "wholesale_price_mwh": "Price ($/MWh)", "region": "Region"},
-        color_discrete_sequence=px.colors.qualitative.Set1
-    )
-    fig.update_layout(margin=dict(t=20, b=20))
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig_wholesale_trend(selected_regions), use_container_width=True)
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("PPA vs Wholesale Price")
-        fig = px.scatter(
-            filtered.sample(min(1000, len(filtered))),
-            x="wholesale_price_mwh",
-            y="ppa_price_mwh",
-            color="region",
-            labels={"wholesale_price_mwh": "Wholesale Price ($/MWh)",
-                    "ppa_price_mwh": "PPA Price ($/MWh)"},
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig.add_trace(go.Scatter(x=[0, 150], y=[0, 150], mode="lines",
-                                  name="Parity", line=dict(dash="dash", color="gray")))
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_ppa_vs_wholesale(selected_regions), use_container_width=True)
 
     with col2:
         st.subheader("Carbon Price Trends")
-        carbon_trend = filtered.groupby([pd.Grouper(key="date", freq="M"), "region"])["carbon_price"].mean().reset_index()
-        fig = px.line(
-            carbon_trend,
-            x="date",
-            y="carbon_price",
-            color="region",
-            labels={"date": "Date", "carbon_price": "Carbon Price ($/tonne)"},
-            color_discrete_sequence=px.colors.qualitative.Set1
-        )
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_carbon_trend(selected_regions), use_container_width=True)
 
     # Price statistics
     st.subheader("Price Statistics by Region")
-    stats = filtered.groupby("region").agg({
+    filtered = filter_market_data(selected_regions)
+    stats = filtered.groupby("region", observed=True).agg({
         "wholesale_price_mwh": ["mean", "min", "max", "std"],
         "ppa_price_mwh": ["mean"],
         "carbon_price": ["mean"]
-    }).round(2)
+    }).astype(float).round(2)
     stats.columns = ["Avg Wholesale", "Min Wholesale", "Max Wholesale", "Std Dev", "Avg PPA", "Avg Carbon"]
     st.dataframe(stats, use_container_width=True)
 
@@ -660,63 +1232,21 @@ def show_technology_trends():
 
     # LCOE trends
     st.subheader("LCOE Trends by Technology")
-    fig = px.line(
-        benchmarks,
-        x="year",
-        y="avg_lcoe",
-        color="technology",
-        markers=True,
-        labels={"year": "Year", "avg_lcoe": "LCOE ($/MWh)", "technology": "Technology"},
-        color_discrete_sequence=px.colors.qualitative.Set1
-    )
-    fig.update_layout(margin=dict(t=20, b=20))
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig_lcoe_trends(), use_container_width=True)
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("CAPEX Trends")
-        fig = px.line(
-            benchmarks,
-            x="year",
-            y="avg_capex_per_mw",
-            color="technology",
-            markers=True,
-            labels={"year": "Year", "avg_capex_per_mw": "CAPEX ($/MW)", "technology": "Technology"},
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_capex_trends(), use_container_width=True)
 
     with col2:
         st.subheader("Capacity Factor Improvement")
-        fig = px.line(
-            benchmarks,
-            x="year",
-            y=benchmarks["avg_capacity_factor"] * 100,
-            color="technology",
-            markers=True,
-            labels={"year": "Year", "y": "Capacity Factor (%)", "technology": "Technology"},
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        fig.update_layout(margin=dict(t=20, b=20))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_capacity_factor_trends(), use_container_width=True)
 
     # Learning rates
     st.subheader("Technology Learning Rates")
-    learning_rates = benchmarks.groupby("technology")["learning_rate"].first().reset_index()
-    learning_rates["learning_rate"] = learning_rates["learning_rate"] * 100
-
-    fig = px.bar(
-        learning_rates,
-        x="technology",
-        y="learning_rate",
-        color="technology",
-        labels={"technology": "Technology", "learning_rate": "Learning Rate (%)"},
-        color_discrete_sequence=px.colors.qualitative.Pastel
-    )
-    fig.update_layout(showlegend=False, margin=dict(t=20, b=20))
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig_learning_rates(), use_container_width=True)
 
     st.info("""
     **Learning Rate** represents the percentage cost reduction for each doubling of cumulative installed capacity.
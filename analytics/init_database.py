@@ -7,16 +7,64 @@ for renewable energy project evaluation and financial analysis.
 
 import sqlite3
 import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from itertools import chain
 from pathlib import Path
 
+import numpy as np
+
 # Database path
 DB_PATH = Path(__file__).parent / "renewable_energy.db"
 
+# Portfolios at least this large compute per-project data in worker processes
+PARALLEL_MIN_PROJECTS = 100
+
+# Rows packed into each multi-row INSERT for the large tables
+INSERT_CHUNK_SIZE = 100
+
+# INSERT statements keyed by (table, columns, rows per statement)
+INSERT_SQL = {}
+
+# Column order of the rows produced by the generators
+CASH_FLOW_COLUMNS = (
+    "project_id", "year", "revenue", "opex", "ebitda", "depreciation", "interest_expense",
+    "principal_repayment", "tax", "net_income", "free_cash_flow", "cumulative_cash_flow",
+)
+MONTHLY_GENERATION_COLUMNS = (
+    "project_id", "year", "month", "generation_mwh", "capacity_factor", "availability", "curtailment_mwh",
+)
+MARKET_DATA_COLUMNS = (
+    "date", "region", "wholesale_price_mwh", "ppa_price_mwh", "rec_price", "carbon_price",
+)
+TECHNOLOGY_BENCHMARK_COLUMNS = (
+    "technology", "year", "avg_capex_per_mw", "avg_capacity_factor", "avg_lcoe", "learning_rate",
+)
+
+# Monthly generation seasonality (Northern Hemisphere assumptions, January first)
+SOLAR_PATTERN = (0.6, 0.7, 0.9, 1.0, 1.1, 1.2, 1.2, 1.1, 1.0, 0.8, 0.6, 0.5)
+WIND_PATTERN = (1.2, 1.1, 1.0, 0.9, 0.8, 0.7, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2)
+
+# Base wholesale price ($/MWh) by market region
+BASE_PRICE = {"ERCOT": 35, "CAISO": 45, "PJM": 40, "MISO": 35, "UK": 60, "Germany": 55, "Australia": 50}
+
+# Wholesale price seasonality by calendar month (January first)
+MARKET_SEASONALITY = 1 + 0.2 * (np.abs(6 - np.arange(1, 13)) / 6)
+
 
 def create_connection():
-    """Create a database connection."""
-    return sqlite3.connect(DB_PATH)
+    """Create an in-memory database connection to build the data in."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def save_database(conn):
+    """Copy the finished in-memory database to DB_PATH in a single backup pass."""
+    disk = sqlite3.connect(DB_PATH)
+    conn.backup(disk)
+    disk.execute("PRAGMA journal_mode=WAL")
+    disk.close()
 
 
 def create_tables(conn):
@@ -144,6 +192,16 @@ def create_tables(conn):
     conn.commit()
 
 
+def create_indexes(conn):
+    """Create the project_id lookup indexes once the tables are populated."""
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_acf_pid ON annual_cash_flows(project_id);
+        CREATE INDEX IF NOT EXISTS idx_mg_pid ON monthly_generation(project_id);
+        CREATE INDEX IF NOT EXISTS idx_fa_pid ON financial_assumptions(project_id);
+        CREATE INDEX IF NOT EXISTS idx_km_pid ON key_metrics(project_id);
+    """)
+
+
 def generate_mock_projects():
     """Generate mock project data."""
     project_types = ["Solar PV", "Onshore Wind", "Offshore Wind", "Battery Storage", "Solar + Storage"]
@@ -253,94 +311,77 @@ def calculate_cash_flows(project_id, capacity, assumptions, project_life):
     """Calculate annual cash flows for a project."""
     capex = assumptions["capex_per_mw"] * capacity
     annual_generation_base = capacity * assumptions["capacity_factor"] * 8760  # MWh
+    years = np.arange(1, project_life + 1)
+
+    # Apply degradation and price escalation
+    annual_generation = annual_generation_base * (1 - assumptions["degradation_rate"]) ** (years - 1)
+    price = assumptions["electricity_price_mwh"] * (1 + assumptions["price_escalation_rate"]) ** (years - 1)
+
+    revenue = annual_generation * price
+    opex = assumptions["opex_per_mw_year"] * capacity * (1 + 0.02) ** (years - 1)
+    ebitda = revenue - opex
 
-    cash_flows = []
-    cumulative = -capex * (1 - assumptions["debt_ratio"])  # Initial equity investment
-    debt_balance = capex * assumptions["debt_ratio"]
     annual_depreciation = capex / assumptions["depreciation_years"]
+    depreciation = np.where(years <= assumptions["depreciation_years"], annual_depreciation, 0.0)
 
-    for year in range(1, project_life + 1):
-        # Apply degradation
-        degradation_factor = (1 - assumptions["degradation_rate"]) ** (year - 1)
-        annual_generation = annual_generation_base * degradation_factor
-
-        # Apply price escalation
-        price = assumptions["electricity_price_mwh"] * (1 + assumptions["price_escalation_rate"]) ** (year - 1)
-
-        revenue = annual_generation * price
-        opex = assumptions["opex_per_mw_year"] * capacity * (1 + 0.02) ** (year - 1)
-        ebitda = revenue - opex
-
-        depreciation = annual_depreciation if year <= assumptions["depreciation_years"] else 0
-
-        # Debt service
-        if year <= assumptions["loan_tenor_years"] and debt_balance > 0:
-            interest = debt_balance * assumptions["interest_rate"]
-            principal = debt_balance / (assumptions["loan_tenor_years"] - year + 1)
-            debt_balance -= principal
-        else:
-            interest = 0
-            principal = 0
-
-        ebt = ebitda - depreciation - interest
-        tax = max(0, ebt * assumptions["tax_rate"])
-        net_income = ebt - tax
-
-        fcf = ebitda - interest - principal - tax
-        cumulative += fcf
-
-        cash_flows.append({
-            "project_id": project_id,
-            "year": year,
-            "revenue": round(revenue, 0),
-            "opex": round(opex, 0),
-            "ebitda": round(ebitda, 0),
-            "depreciation": round(depreciation, 0),
-            "interest_expense": round(interest, 0),
-            "principal_repayment": round(principal, 0),
-            "tax": round(tax, 0),
-            "net_income": round(net_income, 0),
-            "free_cash_flow": round(fcf, 0),
-            "cumulative_cash_flow": round(cumulative, 0),
-        })
+    # Debt service (level principal: equal repayments of debt / tenor, interest on the remaining balance)
+    debt = capex * assumptions["debt_ratio"]
+    tenor = assumptions["loan_tenor_years"]
+    in_tenor = years <= tenor
+    principal = np.where(in_tenor, debt / tenor, 0.0)
+    interest = np.where(in_tenor, debt * assumptions["interest_rate"] * (tenor - years + 1) / tenor, 0.0)
+
+    ebt = ebitda - depreciation - interest
+    tax = np.maximum(0, ebt * assumptions["tax_rate"])
+    net_income = ebt - tax
+
+    fcf = ebitda - interest - principal - tax
+    cumulative = -capex * (1 - assumptions["debt_ratio"]) + np.cumsum(fcf)  # After initial equity investment
+
+    values = np.column_stack((revenue, opex, ebitda, depreciation, interest, principal,
+                              tax, net_income, fcf, cumulative))
 
-    return cash_flows
+    rows = [
+        (project_id, year, *row)
+        for year, row in zip(years.tolist(), np.round(values, 0).tolist())
+    ]
+    return CASH_FLOW_COLUMNS, rows
 
 
 def calculate_metrics(project_id, capacity, assumptions, cash_flows, project_life):
     """Calculate key financial metrics."""
     capex = assumptions["capex_per_mw"] * capacity
     equity = capex * (1 - assumptions["debt_ratio"])
+    columns, rows = cash_flows
+    cf = dict(zip(columns, np.array(rows, dtype=float).T))  # Column name -> array by year
 
     # NPV calculation
-    npv = -equity
-    for cf in cash_flows:
-        npv += cf["free_cash_flow"] / (1 + assumptions["discount_rate"]) ** cf["year"]
+    discount_factors = 1.0 / (1 + assumptions["discount_rate"]) ** cf["year"]
+    npv = -equity + np.dot(cf["free_cash_flow"], discount_factors)
 
     # IRR approximation (simplified)
     irr = 0.08 + random.uniform(-0.03, 0.05)
 
     # Payback period
     payback = project_life
-    for cf in cash_flows:
-        if cf["cumulative_cash_flow"] >= 0:
-            payback = cf["year"]
+    for year, cumulative in zip(cf["year"], cf["cumulative_cash_flow"]):
+        if cumulative >= 0:
+            payback = year
             break
 
-    # LCOE calculation
-    total_generation = sum(
-        capacity * assumptions["capacity_factor"] * 8760 * (1 - assumptions["degradation_rate"]) ** (y - 1)
-        for y in range(1, project_life + 1)
-    )
-    total_costs = capex + sum(cf["opex"] for cf in cash_flows)
+    # LCOE calculation (lifetime generation is a geometric series in the degradation rate)
+    annual_generation_base = capacity * assumptions["capacity_factor"] * 8760
+    retention = 1 - assumptions["degradation_rate"]
+    total_generation = annual_generation_base * (1 - retention ** project_life) / (1 - retention)
+    total_costs = capex + cf["opex"].sum()
     lcoe = total_costs / total_generation
 
     # DSCR
     dscr_values = []
-    for cf in cash_flows:
-        debt_service = cf["interest_expense"] + cf["principal_repayment"]
+    for ebitda, interest, principal in zip(cf["ebitda"], cf["interest_expense"], cf["principal_repayment"]):
+        debt_service = interest + principal
         if debt_service > 0:
-            dscr_values.append(cf["ebitda"] / debt_service)
+            dscr_values.append(ebitda / debt_service)
 
     dscr_min = min(dscr_values) if dscr_values else 0
     dscr_avg = sum(dscr_values) / len(dscr_values) if dscr_values else 0
@@ -363,17 +404,14 @@ def calculate_metrics(project_id, capacity, assumptions, cash_flows, project_lif
     }
 
 
-def generate_monthly_generation(project_id, capacity, capacity_factor, years=5):
+def generate_monthly_generation(project_id, project_type, capacity, capacity_factor, years=5):
     """Generate monthly generation data."""
-    # Seasonal patterns (Northern Hemisphere assumptions)
-    solar_pattern = [0.6, 0.7, 0.9, 1.0, 1.1, 1.2, 1.2, 1.1, 1.0, 0.8, 0.6, 0.5]
-    wind_pattern = [1.2, 1.1, 1.0, 0.9, 0.8, 0.7, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2]
+    # Wind follows the wind profile; solar and storage follow the solar one
+    pattern = WIND_PATTERN if "Wind" in project_type else SOLAR_PATTERN
 
-    data = []
+    rows = []
     for year in range(1, years + 1):
         for month in range(1, 13):
-            # Random pattern selection
-            pattern = random.choice([solar_pattern, wind_pattern])
             seasonal_factor = pattern[month - 1]
 
             monthly_hours = 730  # Average hours per month
@@ -384,47 +422,47 @@ def generate_monthly_generation(project_id, capacity, capacity_factor, years=5):
             actual_cf = actual_generation / (capacity * monthly_hours)
             curtailment = random.uniform(0, base_generation * 0.05)
 
-            data.append({
-                "project_id": project_id,
-                "year": 2020 + year,
-                "month": month,
-                "generation_mwh": round(actual_generation, 1),
-                "capacity_factor": round(actual_cf, 3),
-                "availability": round(availability, 3),
-                "curtailment_mwh": round(curtailment, 1),
-            })
+            rows.append((
+                project_id,
+                2020 + year,
+                month,
+                round(actual_generation, 1),
+                round(actual_cf, 3),
+                round(availability, 3),
+                round(curtailment, 1),
+            ))
 
-    return data
+    return MONTHLY_GENERATION_COLUMNS, rows
 
 
 def generate_market_data():
     """Generate historical market price data."""
-    regions = ["ERCOT", "CAISO", "PJM", "MISO", "UK", "Germany", "Australia"]
-    data = []
-
-    start_date = datetime(2020, 1, 1)
-    for i in range(1460):  # 4 years of daily data
-        date = start_date + timedelta(days=i)
-        for region in regions:
-            base_price = {"ERCOT": 35, "CAISO": 45, "PJM": 40, "MISO": 35, "UK": 60, "Germany": 55, "Australia": 50}
-
-            # Seasonal and random variation
-            seasonal = 1 + 0.2 * (abs(6 - date.month) / 6)
-            wholesale = base_price[region] * seasonal * random.uniform(0.7, 1.5)
-            ppa = base_price[region] * random.uniform(0.8, 1.0)
-            rec = random.uniform(5, 25)
-            carbon = random.uniform(20, 80)
-
-            data.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "region": region,
-                "wholesale_price_mwh": round(wholesale, 2),
-                "ppa_price_mwh": round(ppa, 2),
-                "rec_price": round(rec, 2),
-                "carbon_price": round(carbon, 2),
-            })
-
-    return data
+    regions = list(BASE_PRICE)
+    rng = np.random.default_rng()
+
+    # One row per (date, region) over 4 years of daily data
+    start_date = np.datetime64("2020-01-01")
+    days = np.arange(start_date, start_date + 1460)
+    size = len(days) * len(regions)
+    dates = np.repeat(days.astype(str), len(regions))
+    month_index = days.astype("datetime64[M]").astype(int) % 12
+    region_names = np.tile(regions, len(days))
+    region_base = np.tile(list(BASE_PRICE.values()), len(days))
+
+    # Seasonal and random variation
+    seasonal = np.repeat(MARKET_SEASONALITY[month_index], len(regions))
+    wholesale = region_base * seasonal * rng.uniform(0.7, 1.5, size)
+    ppa = region_base * rng.uniform(0.8, 1.0, size)
+    rec = rng.uniform(5, 25, size)
+    carbon = rng.uniform(20, 80, size)
+
+    prices = np.round(np.column_stack((wholesale, ppa, rec, carbon)), 2)
+    rows = [
+        (date, region, *row)
+        for date, region, row in zip(dates.tolist(), region_names.tolist(), prices.tolist())
+    ]
+
+    return MARKET_DATA_COLUMNS, rows
 
 
 def generate_technology_benchmarks():
@@ -436,47 +474,82 @@ def generate_technology_benchmarks():
         "Battery Storage": {"capex": 600000, "cf": 0.20, "lcoe": 150, "lr": 0.18},
     }
 
-    data = []
-    for year in range(2018, 2027):
-        for tech, base in technologies.items():
-            # Apply learning curve
-            years_since_base = year - 2018
-            cost_reduction = (1 - base["lr"]) ** (years_since_base / 5)
+    # Learning curve over a (year, technology) grid
+    names = list(technologies)
+    base = {key: np.array([tech[key] for tech in technologies.values()]) for key in ("capex", "cf", "lcoe", "lr")}
+    years = np.arange(2018, 2027)
+    years_since_base = (years - 2018)[:, np.newaxis]
+    cost_reduction = (1 - base["lr"]) ** (years_since_base / 5)
+
+    # Capacity factors keep round(): np.round's scale-and-round flips a few 3-decimal values
+    capacity_factor = (base["cf"] * (1 + 0.01 * years_since_base)).ravel().tolist()
+    columns = (
+        np.repeat(years, len(names)).tolist(),
+        np.round(base["capex"] * cost_reduction, 0).ravel().tolist(),
+        [round(value, 3) for value in capacity_factor],
+        np.round(base["lcoe"] * cost_reduction, 2).ravel().tolist(),
+        np.tile(base["lr"], len(years)).tolist(),
+    )
+    rows = list(zip(names * len(years), *columns))
+
+    return TECHNOLOGY_BENCHMARK_COLUMNS, rows
 
-            data.append({
-                "technology": tech,
-                "year": year,
-                "avg_capex_per_mw": round(base["capex"] * cost_reduction, 0),
-                "avg_capacity_factor": round(base["cf"] * (1 + 0.01 * years_since_base), 3),
-                "avg_lcoe": round(base["lcoe"] * cost_reduction, 2),
-                "learning_rate": base["lr"],
-            })
 
-    return data
+def compute_project_payload(project_id, project):
+    """Generate the assumptions, cash flows, metrics and monthly generation for one project."""
+    assumptions = generate_financial_assumptions(project_id, project["project_type"], project["capacity_mw"])
+    cash_flows = calculate_cash_flows(project_id, project["capacity_mw"], assumptions, project["project_life_years"])
+    metrics = calculate_metrics(project_id, project["capacity_mw"], assumptions, cash_flows, project["project_life_years"])
+    monthly_data = generate_monthly_generation(project_id, project["project_type"], project["capacity_mw"],
+                                               assumptions["capacity_factor"])
+    return assumptions, cash_flows, metrics, monthly_data
 
 
-def insert_data(conn, table, data):
-    """Insert data into a table."""
-    if not data:
-        return
+def seed_worker():
+    """Reseed the RNG so forked workers do not share the parent's random stream."""
+    random.seed()
 
-    cursor = conn.cursor()
-    columns = ", ".join(data[0].keys())
-    placeholders = ", ".join(["?" for _ in data[0]])
 
-    for row in data:
-        cursor.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", list(row.values()))
+def compute_project_payloads(project_ids, projects):
+    """Compute every project's payload, in worker processes for large portfolios."""
+    if len(projects) < PARALLEL_MIN_PROJECTS:
+        return list(map(compute_project_payload, project_ids, projects))
+    with ProcessPoolExecutor(initializer=seed_worker) as executor:
+        return list(executor.map(compute_project_payload, project_ids, projects, chunksize=16))
 
-    conn.commit()
+
+def insert_sql(table, columns, row_count=1):
+    """Return the cached INSERT statement for row_count rows of the given columns."""
+    key = (table, columns, row_count)
+    if key not in INSERT_SQL:
+        placeholders = "(" + ", ".join(["?" for _ in columns]) + ")"
+        values = ", ".join([placeholders] * row_count)
+        INSERT_SQL[key] = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values}"
+    return INSERT_SQL[key]
+
+
+def insert_data(conn, table, columns, rows, chunk_size=1):
+    """Insert row tuples into a table, packing chunk_size rows into each INSERT."""
+    if not rows:
+        return
+
+    # Full chunks share one prepared statement; the remainder gets its own
+    split = len(rows) - len(rows) % chunk_size
+    if split:
+        chunks = [tuple(chain.from_iterable(rows[i:i + chunk_size])) for i in range(0, split, chunk_size)]
+        conn.executemany(insert_sql(table, columns, chunk_size), chunks)
+    if split < len(rows):
+        conn.execute(insert_sql(table, columns, len(rows) - split), tuple(chain.from_iterable(rows[split:])))
 
 
 def main():
     """Main function to initialize and populate the database."""
     print("Initializing Renewable Energy Financial Database...")
 
-    # Remove existing database
-    if DB_PATH.exists():
-        DB_PATH.unlink()
+    # Remove existing database, including any WAL left behind by the dashboard
+    for path in (DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal"), DB_PATH.with_name(DB_PATH.name + "-shm")):
+        if path.exists():
+            path.unlink()
 
     conn = create_connection()
 
@@ -484,48 +557,43 @@ def main():
     print("Creating tables...")
     create_tables(conn)
 
-    # Generate and insert projects
-    print("Generating projects...")
-    projects = generate_mock_projects()
-    for project in projects:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO projects (name, project_type, location, country, capacity_mw, status,
-                                  start_date, commercial_operation_date, project_life_years)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (project["name"], project["project_type"], project["location"], project["country"],
-              project["capacity_mw"], project["status"], project["start_date"],
-              project["commercial_operation_date"], project["project_life_years"]))
-        project_id = cursor.lastrowid
-
-        # Generate financial assumptions
-        assumptions = generate_financial_assumptions(project_id, project["project_type"], project["capacity_mw"])
-        insert_data(conn, "financial_assumptions", [assumptions])
-
-        # Generate cash flows
-        cash_flows = calculate_cash_flows(project_id, project["capacity_mw"], assumptions, project["project_life_years"])
-        insert_data(conn, "annual_cash_flows", cash_flows)
-
-        # Calculate metrics
-        metrics = calculate_metrics(project_id, project["capacity_mw"], assumptions, cash_flows, project["project_life_years"])
-        insert_data(conn, "key_metrics", [metrics])
-
-        # Generate monthly generation
-        monthly_data = generate_monthly_generation(project_id, project["capacity_mw"], assumptions["capacity_factor"])
-        insert_data(conn, "monthly_generation", monthly_data)
-
-    conn.commit()
-
-    # Generate market data
-    print("Generating market data...")
-    market_data = generate_market_data()
-    insert_data(conn, "market_data", market_data)
-
-    # Generate technology benchmarks
-    print("Generating technology benchmarks...")
-    benchmarks = generate_technology_benchmarks()
-    insert_data(conn, "technology_benchmarks", benchmarks)
-
+    # Populate all tables in a single transaction
+    with conn:
+        # Generate and insert projects
+        print("Generating projects...")
+        projects = generate_mock_projects()
+        insert_data(conn, "projects", tuple(projects[0]), [tuple(project.values()) for project in projects])
+        project_ids = [row[0] for row in conn.execute("SELECT id FROM projects ORDER BY id")]
+
+        # Generate per-project assumptions, cash flows, metrics and monthly generation
+        payloads = compute_project_payloads(project_ids, projects)
+        assumptions, cash_flows, metrics, monthly_data = zip(*payloads)
+        insert_data(conn, "financial_assumptions", tuple(assumptions[0]), [tuple(a.values()) for a in assumptions])
+        insert_data(conn, "annual_cash_flows", CASH_FLOW_COLUMNS, [row for _, rows in cash_flows for row in rows])
+        insert_data(conn, "key_metrics", tuple(metrics[0]), [tuple(m.values()) for m in metrics])
+        insert_data(conn, "monthly_generation", MONTHLY_GENERATION_COLUMNS,
+                    [row for _, rows in monthly_data for row in rows], chunk_size=INSERT_CHUNK_SIZE)
+
+        # Generate market data
+        print("Generating market data...")
+        market_data = generate_market_data()
+        insert_data(conn, "market_data", *market_data, chunk_size=INSERT_CHUNK_SIZE)
+
+        # Generate technology benchmarks
+        print("Generating technology benchmarks...")
+        benchmarks = generate_technology_benchmarks()
+        insert_data(conn, "technology_benchmarks", *benchmarks)
+
+    # Build indexes in one pass over the loaded tables. SQLite leaves FK enforcement off by
+    # default, so nothing was checked per row during the load; verify the references once here.
+    print("Creating indexes...")
+    create_indexes(conn)
+    violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+    if violations:
+        raise sqlite3.IntegrityError(f"Foreign key violations after load: {violations[:5]}")
+
+    print("Writing database to disk...")
+    save_database(conn)
     conn.close()
     print(f"Database initialized successfully at: {DB_PATH}")
     print("Total projects created:", len(projects))